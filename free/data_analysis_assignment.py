@@ -1,10 +1,20 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
+import matplotlib
+
+# 画面に表示できる環境（端末から実行し、GUIが使える）かどうか
+# 表示できない場合は Agg バックエンドにしてウィンドウ生成の処理を省く
+INTERACTIVE = sys.stdout.isatty() and (sys.platform in ('win32', 'darwin') or bool(os.environ.get('DISPLAY')))
+if not INTERACTIVE:
+    matplotlib.use('Agg')
+
 import matplotlib.pyplot as plt
 import seaborn as sns
+from pandas.plotting import scatter_matrix
 import statsmodels.api as sm
 from scipy import stats
-import os
 
 # 日本語フォントの設定（環境に合わせて調整が必要な場合があります）
 # Windowsの場合、MS Gothicなどが標準的です
@@ -33,14 +43,14 @@ def create_sample_data(filename='sample_data.csv'):
         'is_weekend': np.random.choice([0, 1], n_samples) # 週末かどうか
     }
     
-    # 外れ値を意図的に追加
-    data['price'][0] = 5000 
-    
     df = pd.DataFrame(data)
     
+    # 外れ値を意図的に追加
+    df.at[0, 'price'] = 5000
+    
     # 距離と価格に相関を持たせる（少しノイズを入れて）
     df['price'] = df['price'] - (df['distance_km'] * 5) + np.random.normal(0, 20, n_samples)
-    df['price'] = df['price'].apply(lambda x: max(x, 10)) # 負の価格を防ぐ
+    df['price'] = np.maximum(df['price'].to_numpy(), 10) # 負の価格を防ぐ
 
     df.to_csv(filename, index=False, encoding='utf-8-sig')
     print(f"完了: '{filename}' を作成しました。")
@@ -62,13 +72,14 @@ def load_data():
             try:
                 # 拡張子によって読み込み方を変える
                 if filepath.endswith('.csv'):
-                    df = pd.read_csv(filepath)
-                elif filepath.endswith('.txt'):
-                    # タブ区切りかカンマ区切りか推定
+                    # pyarrow があればマルチスレッドの高速なパーサーを使う
                     try:
-                        df = pd.read_csv(filepath, sep='\t')
-                    except:
+                        df = pd.read_csv(filepath, engine='pyarrow')
+                    except ImportError:
                         df = pd.read_csv(filepath)
+                elif filepath.endswith('.txt'):
+                    # タブ区切りかカンマ区切りかを自動判定して1回で読み込む
+                    df = pd.read_csv(filepath, sep=None, engine='python')
                 else:
                     print("警告: 対応していない拡張子ですが、CSVとして読み込みを試みます。")
                     df = pd.read_csv(filepath)
@@ -98,21 +109,21 @@ def handle_outliers(df):
     col_name = input(f"外れ値処理をする列名を入力してください (スキップする場合はEnter): ")
     
     if col_name in numeric_cols:
-        # IQR法による外れ値検出
-        Q1 = df[col_name].quantile(0.25)
-        Q3 = df[col_name].quantile(0.75)
+        # IQR法による外れ値検出 (Q1, Q3 を1回の呼び出しでまとめて計算)
+        vals = df[col_name].to_numpy(dtype=np.float64)
+        Q1, Q3 = np.nanquantile(vals, [0.25, 0.75])
         IQR = Q3 - Q1
         lower_bound = Q1 - 1.5 * IQR
         upper_bound = Q3 + 1.5 * IQR
         
-        outliers = df[(df[col_name] < lower_bound) | (df[col_name] > upper_bound)]
+        outliers = df.iloc[(vals < lower_bound) | (vals > upper_bound)]
         print(f"\n検出された外れ値の数: {len(outliers)}")
         print(f"下限: {lower_bound:.2f}, 上限: {upper_bound:.2f}")
         
         if len(outliers) > 0:
             action = input("外れ値をどうしますか？ (1: 削除する, 2: そのままにする): ")
             if action == '1':
-                df_clean = df[(df[col_name] >= lower_bound) & (df[col_name] <= upper_bound)]
+                df_clean = df.iloc[(vals >= lower_bound) & (vals <= upper_bound)]
                 print(f"削除しました。残り行数: {len(df_clean)}")
                 return df_clean
             else:
@@ -142,15 +153,17 @@ def basic_analysis(df):
     plt.tight_layout()
     plt.savefig('histogram.png')
     print("-> 'histogram.png' として保存しました。")
-    plt.show() # 環境によっては表示されない場合があります
+    if INTERACTIVE:
+        plt.show()
+    plt.close()
     
     # 散布図行列
-    print("\n散布図行列を作成中... (時間がかかる場合があります)")
+    print("\n散布図行列を作成中...")
     try:
-        sns.pairplot(df)
+        scatter_matrix(numeric_df, figsize=(10, 8), diagonal='hist', alpha=0.5)
         plt.savefig('scatter_matrix.png')
+        plt.close()
         print("-> 'scatter_matrix.png' として保存しました。")
-        # plt.show()
     except Exception as e:
         print(f"散布図の作成中にエラーが発生しました: {e}")
 
@@ -162,14 +175,20 @@ def advanced_analysis(df):
     numeric_df = df.select_dtypes(include=[np.number])
     if len(numeric_df.columns) > 1:
         print("\n[相関行列]")
-        corr_matrix = numeric_df.corr()
+        # 欠損値を含む行を除いてから np.corrcoef でまとめて計算
+        arr = numeric_df.to_numpy(dtype=np.float64)
+        arr = arr[~np.isnan(arr).any(axis=1)]
+        corr_matrix = pd.DataFrame(np.corrcoef(arr, rowvar=False),
+                                   index=numeric_df.columns, columns=numeric_df.columns)
         print(corr_matrix)
         
         plt.figure(figsize=(10, 8))
-        sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', fmt=".2f")
+        sns.heatmap(corr_matrix.values, annot=True, cmap='coolwarm', fmt=".2f",
+                    xticklabels=corr_matrix.columns, yticklabels=corr_matrix.index)
         plt.title('Correlation Matrix')
         plt.tight_layout()
         plt.savefig('correlation.png')
+        plt.close()
         print("-> 相関ヒートマップを 'correlation.png' に保存しました。")
     
     # クロス集計
@@ -189,7 +208,8 @@ def advanced_analysis(df):
     
     # ダミー変数化 (簡単な例)
     print("\nダミー変数化を実行します（カテゴリ変数を数値化）...")
-    df_dummy = pd.get_dummies(df, drop_first=True)
+    # 対象はカテゴリ列のみ、ダミー列は int8 で持つ（float64 より軽く、回帰でも数値列として扱える）
+    df_dummy = pd.get_dummies(df, columns=cat_cols, drop_first=True, dtype=np.int8)
     print("変換後の列名:", df_dummy.columns.tolist())
     return df_dummy
 
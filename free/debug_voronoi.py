@@ -1,86 +1,35 @@
 # voronoi_kyoto.py
 # 必要なライブラリ：
-# numpy, scipy, matplotlib, shapely, pyproj, geopandas (geopandasは出力/可視化を良くするために任意)
-# インストール例: pip install numpy scipy matplotlib shapely pyproj geopandas
+# numpy, matplotlib, shapely (>=2.0), pyproj, geopandas, orjson (geopandas・orjsonは任意。orjsonがあればGeoJSON書き出しが高速)
+# インストール例: pip install numpy matplotlib "shapely>=2.0" pyproj geopandas
 
 import numpy as np
-from scipy.spatial import Voronoi
 import matplotlib.pyplot as plt
-from shapely.geometry import Polygon, Point, LineString, box, mapping
-from shapely.ops import unary_union
+from matplotlib.collections import PolyCollection
+import shapely
+from shapely.geometry import Polygon, MultiPolygon, Point, LineString, MultiPoint, box, mapping
+from shapely.ops import unary_union, voronoi_diagram
+from shapely.strtree import STRtree
 from pyproj import Transformer
 import json
 import os
+from functools import lru_cache
 
 try:
     import geopandas as gpd
 except Exception:
     gpd = None
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 # --------- ユーティリティ関数 ----------
-def voronoi_finite_polygons_2d(vor, radius=None):
-    """
-    Convert scipy Voronoi to finite polygons (2D).
-    Returns list of regions as list of points (in same coords as input) and region indices.
-    Source idea: https://stackoverflow.com/a/20678647
-    """
-    if vor.points.shape[1] != 2:
-        raise ValueError("Requires 2D input")
-    new_regions = []
-    new_vertices = vor.vertices.tolist()
-
-    center = vor.points.mean(axis=0)
-    if radius is None:
-        radius = np.ptp(vor.points).max() * 2
-
-    # Map ridge vertices to regions
-    all_ridges = {}
-    for (p1, p2), (v1, v2) in zip(vor.ridge_points, vor.ridge_vertices):
-        all_ridges.setdefault(p1, []).append((p2, v1, v2))
-        all_ridges.setdefault(p2, []).append((p1, v1, v2))
-
-    # Construct finite polygons
-    for p1, region_idx in enumerate(vor.point_region):
-        vertices = vor.regions[region_idx]
-        if all(v >= 0 for v in vertices):
-            # finite region
-            new_regions.append([vor.vertices[v].tolist() for v in vertices])
-            continue
-
-        # reconstruct a non-finite region
-        ridges = all_ridges[p1]
-        pts = []
-        for p2, v1, v2 in ridges:
-            if v2 < 0:
-                v1, v2 = v2, v1
-            if v1 >= 0 and v2 >= 0:
-                # both finite
-                continue
-            # compute the missing endpoint at a distance "radius"
-            t = vor.points[p2] - vor.points[p1]  # tangent
-            t = t / np.linalg.norm(t)
-            n = np.array([-t[1], t[0]])  # normal
-            midpoint = vor.points[[p1, p2]].mean(axis=0)
-            direction = np.sign(np.dot(midpoint - center, n)) * n
-            far_point = vor.vertices[v2] + direction * radius
-            new_vertices.append(far_point.tolist())
-            new_v = len(new_vertices) - 1
-            pts.append((v2, new_v))
-
-        # collect region vertices: include existing finite verts + created far points
-        region_vertices = [v for v in vertices if v >= 0]
-        for v2, new_v in pts:
-            region_vertices.append(v2)
-            region_vertices.append(new_v)
-        # order polygon vertices ccw
-        coords = np.array([new_vertices[v] for v in region_vertices])
-        centroid = coords.mean(axis=0)
-        angles = np.arctan2(coords[:,1] - centroid[1], coords[:,0] - centroid[0])
-        order = np.argsort(angles)
-        polygon = coords[order].tolist()
-        new_regions.append(polygon)
-
-    return new_regions
+@lru_cache(maxsize=8)
+def get_transformer(src, dst):
+    """src -> dst の Transformer (always_xy) を作成し、同じ組み合わせは使い回す"""
+    return Transformer.from_crs(src, dst, always_xy=True)
 
 # --------- メイン処理 ----------
 def generate_voronoi(latlon_points, labels=None,
@@ -98,39 +47,45 @@ def generate_voronoi(latlon_points, labels=None,
     """
 
     # 整理：latlon -> numpy array lon/lat (注意: pyproj expects (lon, lat))
-    pts_ll = []
     pts_labels = []
     for i, p in enumerate(latlon_points):
         if len(p) >= 3:
-            lat, lon, lab = p[0], p[1], p[2]
-            pts_ll.append((lon, lat))
-            pts_labels.append(lab)
+            pts_labels.append(p[2])
         else:
-            lat, lon = p
-            pts_ll.append((lon, lat))
             pts_labels.append(labels[i] if labels is not None and i < len(labels) else f"P{i+1}")
+    # (lat, lon[, label]) -> (N, 2) array of lon, lat
+    lonlat = np.array([(p[1], p[0]) for p in latlon_points], dtype=np.float64)
 
     # Projection transformer: WGS84 -> projection_epsg
-    transformer = Transformer.from_crs("EPSG:4326", f"EPSG:{projection_epsg}", always_xy=True)
-    pts_xy = np.array([transformer.transform(lon, lat) for lon, lat in pts_ll])
+    transformer = get_transformer("EPSG:4326", f"EPSG:{projection_epsg}")
+    # 逆変換: projection_epsg -> WGS84 (GeoJSON出力で使い回す)
+    inverse_transformer = get_transformer(f"EPSG:{projection_epsg}", "EPSG:4326")
+    pts_xy = np.column_stack(transformer.transform(lonlat[:, 0], lonlat[:, 1]))
 
-    # Voronoi
-    vor = Voronoi(pts_xy)
+    # Bounding box (with margin) used as the Voronoi envelope and for clipping
+    (minx, miny), (maxx, maxy) = pts_xy.min(axis=0), pts_xy.max(axis=0)
+    bbox = box(minx - clip_margin_m, miny - clip_margin_m, maxx + clip_margin_m, maxy + clip_margin_m)
 
-    # Convert to finite polygons
-    regions = voronoi_finite_polygons_2d(vor)
+    # Voronoi (GEOS): cells already extend over the whole envelope
+    cells = list(voronoi_diagram(MultiPoint(pts_xy.tolist()), envelope=bbox).geoms)
 
-    # Build shapely polygons and clip to bounding box (with margin)
+    # GEOS returns cells in arbitrary order: match each cell to its generator point
     points_geom = [Point(xy) for xy in pts_xy]
-    xs, ys = pts_xy[:,0], pts_xy[:,1]
-    minx, maxx = xs.min(), xs.max()
-    miny, maxy = ys.min(), ys.max()
-    bbox = box(minx - clip_margin_m, miny - clip_margin_m, maxx + clip_margin_m, maxy + clip_margin_m)
+    cell_idx, point_idx = STRtree(points_geom).query_nearest(cells, all_matches=False)
+    regions = [None] * len(pts_xy)
+    for c, p in zip(cell_idx, point_idx):
+        regions[p] = cells[c]
+
+    # Clip to the bounding box: cells fully inside are kept as-is, and the
+    # rest are intersected in one vectorized call
+    polys = np.array(regions, dtype=object)
+    shapely.prepare(bbox)
+    inside = shapely.contains(bbox, polys)
+    clipped = polys.copy()
+    clipped[~inside] = shapely.intersection(polys[~inside], bbox)
 
     poly_list = []
-    for region, label, pt in zip(regions, pts_labels, pts_xy):
-        poly = Polygon(region)
-        poly = poly.intersection(bbox)
+    for poly, label, pt in zip(clipped, pts_labels, pts_xy):
         if not poly.is_empty and poly.is_valid:
             poly_list.append((label, poly, pt))
         else:
@@ -139,10 +94,11 @@ def generate_voronoi(latlon_points, labels=None,
 
     # --- 描画 ---
     fig, ax = plt.subplots(figsize=(10,10))
+    # 領域・母点はそれぞれ1つのコレクションとしてまとめて描画
+    poly_arrays = [np.asarray(poly.exterior.coords) for _, poly, _ in poly_list]
+    ax.add_collection(PolyCollection(poly_arrays, facecolors=[f"C{i % 10}" for i in range(len(poly_arrays))], alpha=0.4))
+    ax.scatter(pts_xy[:,0], pts_xy[:,1], c='k', marker='o')
     for label, poly, pt in poly_list:
-        x,y = poly.exterior.xy
-        ax.fill(x, y, alpha=0.4)
-        ax.plot(pt[0], pt[1], 'ko')
         ax.text(pt[0], pt[1], f" {label}", fontsize=10, verticalalignment='center')
 
     # plot boundaries
@@ -157,13 +113,16 @@ def generate_voronoi(latlon_points, labels=None,
 
     # --- GeoJSON 出力 (if requested) ---
     features = []
+    # convert coordinates back (リングごとに一括変換)
+    def transform_coords(coords):
+        coords = np.asarray(coords)
+        lons, lats = inverse_transformer.transform(coords[:, 0], coords[:, 1])
+        return list(zip(lats.tolist(), lons.tolist()))
+
     for label, poly, pt in poly_list:
         # transform polygon coords back to lon/lat for GeoJSON
-        if hasattr(poly, "geom_type") and poly.geom_type in ("Polygon", "MultiPolygon"):
-            # convert coordinates back
-            def transform_coords(coords):
-                return [Transformer.from_crs(f"EPSG:{projection_epsg}", "EPSG:4326", always_xy=True).transform(x,y)[::-1] for x,y in coords]
-            if poly.geom_type == "Polygon":
+        if isinstance(poly, (Polygon, MultiPolygon)):
+            if isinstance(poly, Polygon):
                 exterior = transform_coords(list(poly.exterior.coords))
                 interiors = [transform_coords(list(ring.coords)) for ring in poly.interiors]
                 geom = {"type": "Polygon", "coordinates": [exterior] + interiors}
@@ -176,7 +135,7 @@ def generate_voronoi(latlon_points, labels=None,
                 geom = {"type": "MultiPolygon", "coordinates": polys}
         else:
             # point fallback
-            lon, lat = Transformer.from_crs(f"EPSG:{projection_epsg}", "EPSG:4326", always_xy=True).transform(pt[0], pt[1])
+            lon, lat = inverse_transformer.transform(pt[0], pt[1])
             geom = {"type": "Point", "coordinates": [lon, lat]}
 
         features.append({
@@ -186,8 +145,12 @@ def generate_voronoi(latlon_points, labels=None,
         })
 
     geo = {"type": "FeatureCollection", "features": features}
-    with open(out_geojson, "w", encoding="utf-8") as f:
-        json.dump(geo, f, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        with open(out_geojson, "wb") as f:
+            f.write(orjson.dumps(geo, option=orjson.OPT_INDENT_2))
+    else:
+        with open(out_geojson, "w", encoding="utf-8") as f:
+            json.dump(geo, f, ensure_ascii=False, indent=2)
 
     # --- geopandas optional output (shapefile etc) ---
     if gpd is not None:
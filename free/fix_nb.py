@@ -1,24 +1,18 @@
-
-import json
-import numpy as np
-
 nb_path = r"c:\Users\ryoya\OneDrive\Documents\課題\プログラミング\private\free\bonoroizu.ipynb"
 
-with open(nb_path, 'r', encoding='utf-8') as f:
-    nb = json.load(f)
+# ノートブックのJSONを読み込み直さず、ファイルのバイト列をそのまま置換する
+# (置換対象の文字列はJSON内でもエスケープされずにそのまま現れる)
+old = b'vor.points.ptp().max()'
+new = b'np.ptp(vor.points).max()'
 
-for cell in nb['cells']:
-    if cell['cell_type'] == 'code':
-        new_source = []
-        for line in cell['source']:
-            if 'vor.points.ptp().max()' in line:
-                new_line = line.replace('vor.points.ptp().max()', 'np.ptp(vor.points).max()')
-                new_source.append(new_line)
-            else:
-                new_source.append(line)
-        cell['source'] = new_source
+with open(nb_path, 'rb') as f:
+    data = f.read()
 
-with open(nb_path, 'w', encoding='utf-8') as f:
-    json.dump(nb, f, ensure_ascii=False, indent=1)
+fixed = data.replace(old, new)
 
-print("Fixed bonoroizu.ipynb")
+if fixed != data:
+    with open(nb_path, 'wb') as f:
+        f.write(fixed)
+    print("Fixed bonoroizu.ipynb")
+else:
+    print("bonoroizu.ipynb is already fixed")
@@ -1,7 +1,17 @@
+import os
+import sys
 import numpy as np
+import matplotlib
+
+# 画面に表示できない環境（バッチ実行など）では Agg バックエンドで保存のみ行う
+INTERACTIVE = sys.stdout.isatty() and (sys.platform in ('win32', 'darwin') or bool(os.environ.get('DISPLAY')))
+if not INTERACTIVE:
+    matplotlib.use('Agg')
+
 import matplotlib.pyplot as plt
 from scipy.spatial import Voronoi, voronoi_plot_2d
 import matplotlib.patches as mpatches
+from matplotlib.collections import LineCollection, PolyCollection
 
 # 日本語フォント設定
 plt.rcParams['font.sans-serif'] = ['MS Gothic', 'Yu Gothic', 'Meiryo']
@@ -17,7 +27,7 @@ locations = {
 }
 
 # 座標を配列に変換（経度、緯度の順）
-points = np.array([[lon, lat] for lat, lon in locations.values()])
+points = np.array(list(locations.values()), dtype=np.float64)[:, ::-1]
 names = list(locations.keys())
 
 # ボロノイ図の計算
@@ -33,24 +43,27 @@ hokkaido_lat_min, hokkaido_lat_max = 41.3, 45.5
 # ボロノイ領域を色分けして描画
 colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A', '#98D8C8']
 
-# 各ボロノイ領域を塗りつぶし
+# 各ボロノイ領域を塗りつぶし（有限の領域をまとめて1つのコレクションで描画）
+region_polygons = []
+region_colors = []
 for i, region_index in enumerate(vor.point_region):
     region = vor.regions[region_index]
     if not -1 in region and len(region) > 0:
-        polygon = [vor.vertices[j] for j in region]
-        ax.fill(*zip(*polygon), alpha=0.4, color=colors[i], edgecolor='black', linewidth=2)
+        region_polygons.append(vor.vertices[region])
+        region_colors.append(colors[i])
+ax.add_collection(PolyCollection(region_polygons, facecolors=region_colors,
+                                 edgecolors='black', linewidths=2, alpha=0.4))
 
-# ボロノイ図のエッジを描画
-for simplex in vor.ridge_vertices:
-    simplex = np.asarray(simplex)
-    if np.all(simplex >= 0):
-        ax.plot(vor.vertices[simplex, 0], vor.vertices[simplex, 1], 'k-', linewidth=1.5)
+# ボロノイ図のエッジを描画（有限の辺のみをまとめて1つのコレクションで描画）
+ridges = np.asarray(vor.ridge_vertices)
+ridges = ridges[(ridges >= 0).all(axis=1)]
+ax.add_collection(LineCollection(vor.vertices[ridges], colors='k', linewidths=1.5))
 
 # 母点（観光地）をプロット
+ax.scatter(points[:, 0], points[:, 1], s=15**2, c=colors[:len(points)],
+           edgecolors='white', linewidths=3, zorder=5)
+
 for i, (name, (lat, lon)) in enumerate(locations.items()):
-    ax.plot(lon, lat, 'o', markersize=15, color=colors[i], 
-            markeredgecolor='white', markeredgewidth=3, zorder=5)
-    
     # ラベルを表示（背景を白にして見やすく）
     ax.text(lon, lat + 0.15, name, fontsize=14, fontweight='bold',
             ha='center', va='bottom',
@@ -90,8 +103,10 @@ plt.savefig('hokkaido_voronoi.png', dpi=300, bbox_inches='tight',
             facecolor='white', edgecolor='none')
 print("ボロノイ図を 'hokkaido_voronoi.png' として保存しました。")
 
-# 表示
-plt.show()
+# 表示（対話的に実行している場合のみ）
+if INTERACTIVE:
+    plt.show()
+plt.close(fig)
 
 # 各観光地の座標情報を出力
 print("\n【観光地の座標情報】")
@@ -1,6 +1,22 @@
 import folium
 import numpy as np
 
+EARTH_RADIUS_M = 6371000 # Earth radius in meters
+
+def haversine_vector(pts1, pts2):
+    """
+    Great-circle distance in meters between (lat, lon) pairs.
+    pts1 and pts2 are (N, 2) arrays (a single (2,) pair is also accepted);
+    all N distances are computed in one vectorized pass.
+    """
+    lat1, lon1 = np.radians(np.atleast_2d(pts1)).T
+    lat2, lon2 = np.radians(np.atleast_2d(pts2)).T
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat*0.5)**2 + np.cos(lat1)*np.cos(lat2) * np.sin(dlon*0.5)**2
+    # 2*arcsin(sqrt(a)) == 2*arctan2(sqrt(a), sqrt(1-a)), with one sqrt fewer
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
 def create_apollonius_map():
     # 1. Coordinates
     # Kyoto Station (A)
@@ -18,38 +34,21 @@ def create_apollonius_map():
     # Center C = (k^2 * B - A) / (k^2 - 1)
     # Radius R = k * |AB| / |k^2 - 1|
     
-    # Note: We can use the internal/external division point method which is numerically stable and equivalent.
-    # Internal division point (k:1) -> P_in divides AB in ratio k:1
-    # P_in = (A + k*B) / (1 + k)
-    P_in = (kyoto_station + k * kiyomizu_dera) / (1 + k)
-
-    # External division point (k:1) -> P_out divides AB externally in ratio k:1
-    # P_out = (kyoto_station - k * kiyomizu_dera) / (1 - k)
-    P_out = (kyoto_station - k * kiyomizu_dera) / (1 - k)
+    k2 = k * k
+    denom = k2 - 1.0
+    center = (k2 * kiyomizu_dera - kyoto_station) / denom
 
-    # Center is midpoint of P_in and P_out
-    center = (P_in + P_out) / 2
-    
     # Calculate radius in meters for Folium
-    def get_dist_meters(pt1, pt2):
-        R = 6371000 # Earth radius in meters
-        lat1, lon1 = np.radians(pt1)
-        lat2, lon2 = np.radians(pt2)
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = np.sin(dlat/2)**2 + np.cos(lat1)*np.cos(lat2) * np.sin(dlon/2)**2
-        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
-        return R * c
-
-    radius_meters = get_dist_meters(center, P_in)
+    radius_meters = k * haversine_vector(kyoto_station, kiyomizu_dera)[0] / abs(denom)
     
     # Radius in degrees for generating points (approximate for plotting markers)
-    radius_deg_lat = np.abs(P_in[0] - P_out[0]) / 2
+    diff = kyoto_station - kiyomizu_dera
+    radius_deg_lat = abs(k * diff[0] / denom)
     # Adjust longitude radius for latitude
     radius_deg_lon = radius_deg_lat / np.cos(np.radians(center[0]))
 
     # 4. Visualization
-    m = folium.Map(location=center, zoom_start=14)
+    m = folium.Map(location=center, zoom_start=14, prefer_canvas=True)
 
     # Marker A: Kyoto Station
     folium.Marker(
@@ -86,15 +85,16 @@ def create_apollonius_map():
     # Candidate points on the circle
     # Generate 5 candidate points
     angles = np.linspace(0, 2*np.pi, 5, endpoint=False)
-    for i, ang in enumerate(angles):
-        # Calculate point on the circle
-        c_lat = center[0] + radius_deg_lat * np.sin(ang)
-        c_lon = center[1] + radius_deg_lon * np.cos(ang)
-        
+    # Calculate all points on the circle at once
+    c_lats = center[0] + radius_deg_lat * np.sin(angles)
+    c_lons = center[1] + radius_deg_lon * np.cos(angles)
+    # Each marker needs its own Icon instance, but the options are shared
+    candidate_icon_kwargs = dict(color='green', icon='info-sign')
+    for i, (c_lat, c_lon) in enumerate(zip(c_lats.tolist(), c_lons.tolist())):
         folium.Marker(
             [c_lat, c_lon], 
             popup=f'Candidate Info Center {i+1}', 
-            icon=folium.Icon(color='green', icon='info-sign')
+            icon=folium.Icon(**candidate_icon_kwargs)
         ).add_to(m)
 
     # Save map
@@ -1,6 +1,11 @@
 import folium
 import json
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 # 観光地の座標データ
 landmarks = [
     {"name": "清水寺", "label": "Kiyomizu-dera (清水寺)", "lat": 34.9949, "lon": 135.7850, "color": "#FF6B6B"},
@@ -18,32 +23,40 @@ center_lon = sum(p["lon"] for p in landmarks) / len(landmarks)
 m = folium.Map(
     location=[center_lat, center_lon],
     zoom_start=11,
-    tiles='OpenStreetMap'
+    tiles='OpenStreetMap',
+    prefer_canvas=True  # ベクターレイヤーをSVGではなく1枚のCanvasに描画する
 )
 
 # GeoJSONファイルを読み込む
 geojson_file = r'c:\Users\ryoya\OneDrive\Documents\課題\プログラミング\private\free\voronoi_kyoto.geojson'
-with open(geojson_file, 'r', encoding='utf-8') as f:
-    geojson_data = json.load(f)
+if orjson is not None:
+    # orjson があれば UTF-8 のバイト列を直接パースする（標準の json より高速）
+    with open(geojson_file, 'rb') as f:
+        geojson_data = orjson.loads(f.read())
+else:
+    with open(geojson_file, 'r', encoding='utf-8') as f:
+        geojson_data = json.load(f)
 
 # 各観光地の色マッピングを作成
 color_map = {landmark["label"]: landmark["color"] for landmark in landmarks}
 
-# GeoJSONの各featureに色を付けて地図に追加
-for feature in geojson_data['features']:
-    label = feature['properties']['label']
-    color = color_map.get(label, '#CCCCCC')  # デフォルトグレー
-    
-    folium.GeoJson(
-        feature,
-        style_function=lambda x, color=color: {
-            'fillColor': color,
-            'color': color,
-            'weight': 2,
-            'fillOpacity': 0.5
-        },
-        popup=folium.Popup(f"<b>{label}</b>の領域", max_width=200)
-    ).add_to(m)
+# GeoJSON全体を1つのレイヤーとして追加し、featureごとの色は label から決める
+def voronoi_style(feature):
+    color = color_map.get(feature['properties']['label'], '#CCCCCC')  # デフォルトグレー
+    return {
+        'fillColor': color,
+        'color': color,
+        'weight': 2,
+        'fillOpacity': 0.5
+    }
+
+voronoi_layer = folium.FeatureGroup(name='ボロノイ領域')
+folium.GeoJson(
+    geojson_data,
+    style_function=voronoi_style,
+    popup=folium.GeoJsonPopup(fields=['label'], aliases=['領域'])
+).add_to(voronoi_layer)
+voronoi_layer.add_to(m)
 
 # 観光地にマーカーを追加
 for landmark in landmarks:
@@ -65,18 +78,18 @@ for landmark in landmarks:
         weight=3
     ).add_to(m)
 
-# 凡例を追加
-legend_html = '''
+# 凡例を追加（断片をリストに集めて最後に1回だけ連結する）
+legend_parts = ['''
 <div style="position: fixed; 
             top: 10px; right: 10px; width: 250px; height: auto; 
             background-color: white; z-index:9999; font-size:14px;
             border:2px solid grey; border-radius: 5px; padding: 10px">
 <h4 style="margin-top:0; margin-bottom:10px;">京都観光地のボロノイ図</h4>
 <p style="margin: 5px 0;">各色の領域は、その色の観光地が最も近いエリアを示します。</p>
-'''
+''']
 
 for landmark in landmarks:
-    legend_html += f'''
+    legend_parts.append(f'''
     <p style="margin: 3px 0;">
         <span style="background-color:{landmark["color"]}; 
                      padding: 3px 8px; 
@@ -85,9 +98,10 @@ for landmark in landmarks:
                      font-weight: bold;">■</span> 
         {landmark['name']}
     </p>
-    '''
+    ''')
 
-legend_html += '</div>'
+legend_parts.append('</div>')
+legend_html = ''.join(legend_parts)
 
 m.get_root().html.add_child(folium.Element(legend_html))
 
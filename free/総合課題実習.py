@@ -39,6 +39,13 @@ print()
 print("【1. データインポート・連結】")
 print("-" * 70)
 
+def CSV読み込み(ファイルパス, **kwargs):
+    """pyarrow があればマルチスレッドの高速なパーサーで、なければ通常のパーサーで読み込む"""
+    try:
+        return pd.read_csv(ファイルパス, engine='pyarrow', encoding='utf-8-sig', **kwargs)
+    except (ImportError, ValueError):
+        return pd.read_csv(ファイルパス, encoding='utf-8-sig', **kwargs)
+
 def データ読み込み():
     """CSVまたはTXTファイルを読み込む"""
     print("分析するデータファイルを読み込みます。")
@@ -61,15 +68,15 @@ def データ読み込み():
         try:
             # 拡張子に応じて読み込み
             if ファイルパス.endswith('.csv'):
-                df = pd.read_csv(ファイルパス, encoding='utf-8-sig')
+                df = CSV読み込み(ファイルパス)
             elif ファイルパス.endswith('.txt'):
                 # タブ区切りを試す
                 try:
-                    df = pd.read_csv(ファイルパス, sep='\t', encoding='utf-8-sig')
+                    df = CSV読み込み(ファイルパス, sep='\t')
                 except:
-                    df = pd.read_csv(ファイルパス, encoding='utf-8-sig')
+                    df = CSV読み込み(ファイルパス)
             else:
-                df = pd.read_csv(ファイルパス, encoding='utf-8-sig')
+                df = CSV読み込み(ファイルパス)
             
             print(f"\n✓ 読み込み成功: {df.shape[0]}行 × {df.shape[1]}列")
             print("\nデータの先頭5行:")
@@ -121,16 +128,18 @@ def サンプルデータ作成():
 # データ読み込み実行
 df = データ読み込み()
 
+# 数値列・カテゴリ列は読み込み直後に1回だけ判定し、以降はこの列リストを使い回す
+数値列 = df.select_dtypes(include=[np.number]).columns.tolist()
+カテゴリ列 = df.select_dtypes(exclude=[np.number]).columns.tolist()
+
 # ========================================
 # 2. 外れ値処理
 # ========================================
 print("\n【2. 外れ値処理】")
 print("-" * 70)
 
-def 外れ値処理(df):
+def 外れ値処理(df, 数値列):
     """IQR法による外れ値の検出と処理"""
-    数値列 = df.select_dtypes(include=[np.number]).columns.tolist()
-    
     if not 数値列:
         print("数値データが見つかりません。スキップします。\n")
         return df
@@ -144,14 +153,14 @@ def 外れ値処理(df):
         print("処理をスキップします。\n")
         return df
     
-    # IQR法
-    Q1 = df[対象列].quantile(0.25)
-    Q3 = df[対象列].quantile(0.75)
+    # IQR法 (Q1, Q3 を1回の呼び出しでまとめて計算)
+    値 = df[対象列].to_numpy(dtype=np.float64)
+    Q1, Q3 = np.nanquantile(値, [0.25, 0.75])
     IQR = Q3 - Q1
     下限 = Q1 - 1.5 * IQR
     上限 = Q3 + 1.5 * IQR
     
-    外れ値 = df[(df[対象列] < 下限) | (df[対象列] > 上限)]
+    外れ値 = df.iloc[(値 < 下限) | (値 > 上限)]
     
     print(f"\nIQR法による外れ値検出結果:")
     print(f"  Q1 (25%): {Q1:.2f}")
@@ -167,7 +176,7 @@ def 外れ値処理(df):
         
         処理方法 = input("\n外れ値を削除しますか？ (y/n): ").strip().lower()
         if 処理方法 == 'y':
-            df_clean = df[(df[対象列] >= 下限) & (df[対象列] <= 上限)].copy()
+            df_clean = df.iloc[(値 >= 下限) & (値 <= 上限)].copy()
             print(f"✓ 外れ値を削除しました。残り: {len(df_clean)}行")
             print()
             return df_clean
@@ -175,7 +184,7 @@ def 外れ値処理(df):
     print("データはそのまま使用します。\n")
     return df
 
-df = 外れ値処理(df)
+df = 外れ値処理(df, 数値列)
 
 # ========================================
 # 3. 基本統計量
@@ -191,7 +200,7 @@ print()
 print("\n【4. ヒストグラム・散布図作成】")
 print("-" * 70)
 
-数値df = df.select_dtypes(include=[np.number])
+数値df = df[数値列]
 
 if len(数値df.columns) > 0:
     # ヒストグラム
@@ -199,15 +208,17 @@ if len(数値df.columns) > 0:
     fig, axes = plt.subplots(2, 3, figsize=(15, 10))
     axes = axes.flatten()
     
-    for i, col in enumerate(数値df.columns[:6]):
-        数値df[col].hist(bins=30, ax=axes[i], edgecolor='black')
-        axes[i].set_title(f'{col} の分布', fontsize=12)
-        axes[i].set_xlabel(col)
-        axes[i].set_ylabel('度数')
+    # 先頭6列のヒストグラムを1回の呼び出しでまとめて描画し、ラベルだけ個別に設定
+    ヒスト列 = 数値df.columns[:6]
+    数値df[ヒスト列].hist(bins=30, ax=axes[:len(ヒスト列)], edgecolor='black')
+    for ax, col in zip(axes, ヒスト列):
+        ax.set_title(f'{col} の分布', fontsize=12)
+        ax.set_xlabel(col)
+        ax.set_ylabel('度数')
     
     # 余ったサブプロットを非表示
-    for j in range(i+1, len(axes)):
-        axes[j].axis('off')
+    for ax in axes[len(ヒスト列):]:
+        ax.axis('off')
     
     plt.tight_layout()
     plt.savefig('ヒストグラム.png', dpi=150, bbox_inches='tight')
@@ -217,8 +228,23 @@ if len(数値df.columns) > 0:
     # 散布図
     if len(数値df.columns) >= 2:
         print("散布図を作成中...")
-        plt.figure(figsize=(10, 8))
-        sns.pairplot(df.select_dtypes(include=[np.number]).iloc[:, :4])
+        # 対角はヒストグラム、それ以外は hexbin（点数が多くても描画コストが増えにくい）
+        散布列 = 数値df.columns[:4]
+        k = len(散布列)
+        fig, axes = plt.subplots(k, k, figsize=(3 * k, 3 * k), squeeze=False)
+        for i, 列i in enumerate(散布列):
+            for j, 列j in enumerate(散布列):
+                ax = axes[i, j]
+                if i == j:
+                    ax.hist(数値df[列i].dropna(), bins=30, edgecolor='black')
+                else:
+                    組 = 数値df[[列j, 列i]].dropna()
+                    ax.hexbin(組[列j], 組[列i], gridsize=40, cmap='Blues', mincnt=1)
+                if i == k - 1:
+                    ax.set_xlabel(列j)
+                if j == 0:
+                    ax.set_ylabel(列i)
+        plt.tight_layout()
         plt.savefig('散布図.png', dpi=150, bbox_inches='tight')
         print("✓ '散布図.png' を保存しました。")
         plt.close()
@@ -234,14 +260,24 @@ print("-" * 70)
 # 相関分析
 if len(数値df.columns) > 1:
     print("相関行列:")
-    相関行列 = 数値df.corr()
+    X = 数値df.to_numpy(dtype=np.float64)
+    if np.isnan(X).any():
+        # 欠損値がある場合はペアごとに欠損を除外する pandas の計算を使う
+        相関行列 = 数値df.corr()
+    else:
+        # 欠損値がなければ標準化して行列積1回で相関行列を求める
+        X = X - X.mean(axis=0)
+        X /= X.std(axis=0)
+        相関行列 = pd.DataFrame((X.T @ X) / len(X), index=数値df.columns, columns=数値df.columns)
     print(相関行列)
     print()
     
     # 相関ヒートマップ
+    # セルごとの数値表示は列数が少ないときだけにする（列数の2乗個の文字を描画するため）
+    注記 = 相関行列.shape[0] <= 15
     plt.figure(figsize=(10, 8))
-    sns.heatmap(相関行列, annot=True, cmap='coolwarm', center=0, 
-                fmt='.2f', square=True, linewidths=1)
+    sns.heatmap(相関行列, annot=注記, cmap='coolwarm', center=0, 
+                fmt='.2f', square=True, linewidths=1 if 注記 else 0)
     plt.title('相関行列ヒートマップ', fontsize=16, pad=20)
     plt.tight_layout()
     plt.savefig('相関分析.png', dpi=150, bbox_inches='tight')
@@ -249,7 +285,6 @@ if len(数値df.columns) > 1:
     plt.close()
 
 # クロス集計
-カテゴリ列 = df.select_dtypes(exclude=[np.number]).columns.tolist()
 if len(カテゴリ列) >= 2:
     print(f"\nクロス集計 ({カテゴリ列[0]} × {カテゴリ列[1]}):")
     クロス表 = pd.crosstab(df[カテゴリ列[0]], df[カテゴリ列[1]])
@@ -264,7 +299,8 @@ print("-" * 70)
 
 if カテゴリ列:
     print(f"カテゴリ変数を数値化します: {', '.join(カテゴリ列)}")
-    df_ダミー = pd.get_dummies(df, columns=カテゴリ列, drop_first=True)
+    # ダミー列は uint8 で持つ（float64 より軽く、回帰分析でも数値列として選べる）
+    df_ダミー = pd.get_dummies(df, columns=カテゴリ列, drop_first=True, dtype=np.uint8)
     print(f"✓ ダミー変数化完了。列数: {df.shape[1]} → {df_ダミー.shape[1]}")
     print("新しい列名の例:", df_ダミー.columns.tolist()[:10])
     print()
@@ -288,10 +324,16 @@ if カテゴリ列 and len(数値df.columns) > 0:
     if len(グループ) >= 2 and len(数値df.columns) > 0:
         数値変数 = 数値df.columns[0]
         
-        グループ1 = df[df[カテゴリ] == グループ[0]][数値変数].dropna()
-        グループ2 = df[df[カテゴリ] == グループ[1]][数値変数].dropna()
+        # 列を一度だけ配列として取り出し、マスクで2群に分ける
+        値 = df[数値変数].to_numpy(dtype=np.float64)
+        カテゴリ値 = df[カテゴリ].to_numpy()
+        グループ1 = 値[カテゴリ値 == グループ[0]]
+        グループ2 = 値[カテゴリ値 == グループ[1]]
+        グループ1 = グループ1[~np.isnan(グループ1)]
+        グループ2 = グループ2[~np.isnan(グループ2)]
         
-        t統計量, p値 = stats.ttest_ind(グループ1, グループ2)
+        # 2群の分散が等しいとは限らないので Welch の t検定を使う
+        t統計量, p値 = stats.ttest_ind(グループ1, グループ2, equal_var=False)
         
         print(f"\n変数: {数値変数}")
         print(f"グループ1 ({グループ[0]}): 平均={グループ1.mean():.2f}, n={len(グループ1)}")
@@ -1,35 +1,38 @@
-import struct
 import math
+import numpy as np
 
 def half_16bit_add(a, b):
     """
     16ビット(half)として加算を行う。
     16ビットを超える（0xFFFFを超える）場合は下位16ビットのみを保持する。
+    配列を渡すと要素ごとにまとめて計算する。
     """
-    return (a + b) & 0xFFFF
+    # uint16 同士の演算は自然に下位16ビットで折り返すため、& 0xFFFF は不要
+    return np.asarray(a, dtype=np.uint16) + np.asarray(b, dtype=np.uint16)
 
 def half_16bit_sub(a, b):
     """
     16ビット(half)として減算を行う。
     結果が負になる場合は2の補数表現（下位16ビット保持）としてラップアラウンドする。
+    配列を渡すと要素ごとにまとめて計算する。
     """
-    return (a - b) & 0xFFFF
+    return np.asarray(a, dtype=np.uint16) - np.asarray(b, dtype=np.uint16)
 
 def half_16bit_mul(a, b):
     """
     16ビット(half)として乗算を行う。
     16ビットを超える場合は下位16ビットのみを保持する。
+    配列を渡すと要素ごとにまとめて計算する。
     """
-    return (a * b) & 0xFFFF
+    return np.asarray(a, dtype=np.uint16) * np.asarray(b, dtype=np.uint16)
 
 def float_to_hex_ieee754(f):
     """
     IEEE 754 単精度（32ビット）浮動小数点数を16進数文字列に変換する。
     """
-    # 'f'は単精度、'I'は無符号整数（32ビット）
-    packed = struct.pack('>f', f)
-    unpacked = struct.unpack('>I', packed)[0]
-    return f"0x{unpacked:08X}"
+    # 単精度(float32)のビット列をそのまま無符号32ビット整数(uint32)として読み替える
+    bits = np.float32(f).view(np.uint32).item()
+    return f"0x{bits:08X}"
 
 def hex_to_float_ieee754(h_str):
     """
@@ -39,8 +42,8 @@ def hex_to_float_ieee754(h_str):
         h = int(h_str, 16)
     else:
         h = h_str
-    packed = struct.pack('>I', h)
-    return struct.unpack('>f', packed)[0]
+    # uint32 のビット列を float32 として読み替える
+    return np.uint32(h).view(np.float32).item()
 
 def solve_quadratic_standard(a, b, c):
     """